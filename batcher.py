@@ -0,0 +1,96 @@
+# batcher.py
+import asyncio
+from typing import Awaitable, Callable, List
+
+
+class AsyncBatcher:
+    """
+    Coalesces items submitted within a short window into batches.
+
+    Callers `await submit(item)` and get back their own result; a background
+    worker collects up to `max_batch_size` items (waiting at most
+    `max_wait_ms` after the first one), groups them into length buckets so
+    long inputs don't hold up short ones, and hands each bucket to
+    `process_batch`, which must return one result per item, in order. A result
+    that is an exception instance is raised to that item's caller only.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[str]], Awaitable[List[str]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 25,
+        max_batch_chars: int = 35000,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_batch_chars = max_batch_chars
+        self._queue = None
+        self._worker = None
+        self._tasks = set()
+
+    async def submit(self, item: str) -> str:
+        """Queue an item and wait for its result."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for one item, then gather more until the window closes or the batch is full."""
+        pending = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(pending) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return pending
+
+    def _buckets(self, pending: list) -> List[list]:
+        """Split pending items into buckets of similar length that fit in one prompt."""
+        buckets = []
+        current, size = [], 0
+        for entry in sorted(pending, key=lambda e: len(e[0])):
+            if current and size + len(entry[0]) > self.max_batch_chars:
+                buckets.append(current)
+                current, size = [], 0
+            current.append(entry)
+            size += len(entry[0])
+        if current:
+            buckets.append(current)
+        return buckets
+
+    async def _dispatch(self, bucket: list):
+        """Process one bucket and resolve its futures."""
+        try:
+            results = await self.process_batch([item for item, _ in bucket])
+            if len(results) != len(bucket):
+                raise RuntimeError(f"Batch returned {len(results)} results for {len(bucket)} items")
+        except Exception as e:
+            for _, future in bucket:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(bucket, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def _run(self):
+        while True:
+            pending = await self._collect()
+            for bucket in self._buckets(pending):
+                task = asyncio.create_task(self._dispatch(bucket))
+                # Keep a reference so in-flight batches aren't garbage collected
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
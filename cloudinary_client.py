@@ -0,0 +1,38 @@
+# cloudinary_client.py
+import time
+import cloudinary
+import cloudinary.utils
+import httpx
+
+class CloudinaryClient:
+    """
+    Async Cloudinary uploads over a shared httpx.AsyncClient, so every upload
+    reuses pooled keep-alive connections instead of a fresh TLS handshake.
+    Credentials come from the global cloudinary.config().
+    """
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+
+    async def upload_raw(self, data: bytes, public_id: str, folder: str = "summaries",
+                         filename: str = "summary.pdf") -> dict:
+        """Upload bytes as a raw resource; returns Cloudinary's upload response."""
+        params = {"folder": folder, "public_id": public_id, "timestamp": int(time.time())}
+        # sign_request honours the configured signature algorithm/version and adds api_key
+        params = cloudinary.utils.sign_request(params, {})
+
+        response = await self.http.post(
+            cloudinary.utils.cloudinary_api_url("upload", resource_type="raw"),
+            data=params,
+            files={"file": (filename, data, "application/pdf")},
+        )
+        if response.is_error:
+            try:
+                message = response.json().get("error", {}).get("message", response.reason_phrase)
+            except ValueError:
+                message = f"{response.status_code} {response.reason_phrase}"
+            raise RuntimeError(f"Cloudinary upload failed: {message}")
+        result = response.json()
+        if "error" in result:
+            raise RuntimeError(f"Cloudinary upload failed: {result['error'].get('message')}")
+        return result
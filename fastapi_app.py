@@ -1,15 +1,25 @@
 # fastapi_app.py
+import asyncio
+import hashlib
+import io
 import os
 import tempfile
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ValidationError
 from typing import Optional
+import orjson
+import httpx
 import cloudinary
-import cloudinary.uploader
 from dotenv import load_dotenv
-from summarizer import summarize_json_input
+from batcher import AsyncBatcher
+from cloudinary_client import CloudinaryClient
+from summarizer import DEFAULT_MODEL, close_clients, get_client, summarize_json_input
 
 # Load environment variables
 load_dotenv()
@@ -21,10 +31,44 @@ cloudinary.config(
     api_secret=os.getenv("CLOUDINARY_API_SECRET")
 )
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Set up shared resources before the first request and release them on shutdown:
+    - one bounded thread pool for all blocking work (summarization, cleanup)
+      handed off with asyncio.to_thread
+    - the Gemini client, with its connection opened so no user request pays
+      the cold start
+    - one pooled keep-alive HTTP client for outbound calls (Cloudinary uploads)
+    On shutdown the HTTP client is closed and both thread pools are shut down.
+    """
+    executor = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 4)
+    asyncio.get_running_loop().set_default_executor(executor)
+
+    app.state.gemini = await asyncio.to_thread(get_client, DEFAULT_MODEL)
+    try:
+        await asyncio.to_thread(app.state.gemini.warm_up)
+    except Exception as e:
+        print(f"Gemini warm-up failed (continuing): {e}")
+
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=32),
+        timeout=30
+    )
+    app.state.cloudinary = CloudinaryClient(app.state.http)
+    try:
+        yield
+    finally:
+        await app.state.http.aclose()
+        close_clients()
+        executor.shutdown(wait=False, cancel_futures=True)
+
 app = FastAPI(
     title="JSON Summarizer API",
     description="Submit data in JSON format and get a summarized PDF uploaded to Cloudinary.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware (optional, useful if you have a frontend)
@@ -36,6 +80,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses; small bodies aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Short contents arriving within a few ms of each other are summarized with
+# a single Gemini call instead of one round trip each
+BATCH_MAX_CHARS = 8000
+
+async def _summarize_batch(texts):
+    return await app.state.gemini.summarize_texts_async(texts)
+
+batcher = AsyncBatcher(_summarize_batch, max_batch_size=8, max_wait_ms=25, max_batch_chars=32000)
+
+# Results of recent summaries keyed by a hash of the request payload, so
+# resubmitted documents skip Gemini and the upload entirely
+SUMMARY_CACHE_SIZE = 256
+_summary_cache = OrderedDict()
+
+def _summary_cache_key(content: str, metadata: dict) -> str:
+    payload = content.encode("utf-8") + orjson.dumps(metadata, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(payload).hexdigest()
+
+def _summary_cache_get(key: str):
+    result = _summary_cache.get(key)
+    if result is not None:
+        _summary_cache.move_to_end(key)
+    return result
+
+def _summary_cache_put(key: str, result: dict):
+    _summary_cache[key] = result
+    _summary_cache.move_to_end(key)
+    while len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+
 class Metadata(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
@@ -45,6 +122,31 @@ class JSONInput(BaseModel):
     content: str
     metadata: Optional[Metadata] = None
 
+class SummaryResponse(BaseModel):
+    success: bool
+    cloudinary_url: str
+    public_id: str
+    resource_type: str
+    bytes: int
+    message: str
+
+def _inline_json_schema(model) -> dict:
+    """JSON schema of a model with nested model references inlined, for openapi_extra."""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            ref = node.get("$ref", "")
+            if ref.startswith("#/$defs/"):
+                return resolve(defs[ref.rsplit("/", 1)[-1]])
+            return {key: resolve(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [resolve(value) for value in node]
+        return node
+
+    return resolve(schema)
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -64,8 +166,21 @@ async def root():
         }
     }
 
-@app.post("/summarize")
-async def summarize_json(input_data: JSONInput):
+# The body is validated straight from the raw bytes by pydantic-core (see
+# summarize_json), so the schema is documented by hand instead of via a
+# body parameter
+@app.post(
+    "/summarize",
+    # Declared so the response is serialized by pydantic-core
+    response_model=SummaryResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": _inline_json_schema(JSONInput)}},
+        }
+    },
+)
+async def summarize_json(request: Request):
     """
     Submit JSON data and receive a Cloudinary URL with the summarized PDF.
     
@@ -87,55 +202,66 @@ async def summarize_json(input_data: JSONInput):
         "message": "PDF successfully uploaded to Cloudinary"
     }
     """
-    if not input_data.content.strip():
-        raise HTTPException(status_code=400, detail="Content field cannot be empty.")
+    try:
+        input_data = JSONInput.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Same error locations as FastAPI's own body validation
+        raise RequestValidationError([{**err, "loc": ("body", *err["loc"])} for err in e.errors()])
     
-    tmp_output_path = None
+    if not input_data.content or input_data.content.isspace():
+        raise HTTPException(status_code=400, detail="Content field cannot be empty.")
     
     try:
-        # Define output file path
-        tmp_output_path = os.path.join(tempfile.gettempdir(), "summary_output.pdf")
-        
         # Convert Pydantic model to dict
         json_dict = {"content": input_data.content}
         if input_data.metadata:
-            json_dict["metadata"] = input_data.metadata.dict(exclude_none=True)
+            json_dict["metadata"] = input_data.metadata.model_dump(exclude_none=True)
+        
+        # Identical payloads get the previously uploaded PDF
+        cache_key = _summary_cache_key(input_data.content, json_dict.get("metadata", {}))
+        cached = _summary_cache_get(cache_key)
+        if cached is not None:
+            return cached
         
-        # Run your summarization pipeline
-        pdf_path, _ = summarize_json_input(json_dict, tmp_output_path)
+        # Short contents share a Gemini call with concurrent requests
+        text_summary = None
+        if len(input_data.content) <= BATCH_MAX_CHARS:
+            text_summary = await batcher.submit(input_data.content)
         
-        # Upload PDF to Cloudinary
-        upload_result = cloudinary.uploader.upload(
-            pdf_path,
-            resource_type="raw",
-            folder="summaries",
-            public_id=f"summary_{os.path.basename(pdf_path).replace('.pdf', '')}"
+        # Run your summarization pipeline off the event loop so other
+        # requests keep being served while Gemini is working. The PDF is
+        # written to memory; it never needs to touch the disk.
+        pdf_buffer = io.BytesIO()
+        await asyncio.to_thread(
+            summarize_json_input, json_dict, pdf_buffer, text_summary=text_summary,
+            client=request.app.state.gemini
         )
         
-        # Clean up temporary file
-        if os.path.exists(tmp_output_path):
-            os.remove(tmp_output_path)
+        # Upload PDF to Cloudinary over the shared connection pool.
+        # The public ID is derived from the payload hash so a cached URL always
+        # points at the summary of that payload.
+        upload_result = await request.app.state.cloudinary.upload_raw(
+            pdf_buffer.getvalue(),
+            public_id=f"summary_{cache_key[:32]}",
+            folder="summaries"
+        )
         
         # Return Cloudinary URL and metadata
-        return JSONResponse(
-            status_code=200,
-            content={
-                "success": True,
-                "cloudinary_url": upload_result["secure_url"],
-                "public_id": upload_result["public_id"],
-                "resource_type": upload_result.get("resource_type", "raw"),
-                "bytes": upload_result.get("bytes", 0),
-                "message": "PDF successfully uploaded to Cloudinary"
-            }
-        )
+        result = {
+            "success": True,
+            "cloudinary_url": upload_result["secure_url"],
+            "public_id": upload_result["public_id"],
+            "resource_type": upload_result.get("resource_type", "raw"),
+            "bytes": upload_result.get("bytes", 0),
+            "message": "PDF successfully uploaded to Cloudinary"
+        }
+        _summary_cache_put(cache_key, result)
+        return result
     
     except Exception as e:
-        # Clean up on error
         import traceback
         error_details = traceback.format_exc()
         print(f"Error occurred: {error_details}")
-        if tmp_output_path and os.path.exists(tmp_output_path):
-            os.remove(tmp_output_path)
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
 @app.get("/health")
@@ -147,6 +273,20 @@ async def health_check():
         "version": "1.0.0"
     }
 
+def _cleanup_temp_dir(temp_dir: str) -> int:
+    """Remove leftover summary PDFs from temp_dir and return how many were removed."""
+    cleaned = 0
+    with os.scandir(temp_dir) as entries:
+        for entry in entries:
+            filename = entry.name
+            if filename.endswith("_summary.pdf") or (filename.startswith("tmp") and filename.endswith(".pdf")):
+                try:
+                    os.unlink(entry.path)
+                    cleaned += 1
+                except OSError:
+                    pass
+    return cleaned
+
 # Optional: Add cleanup endpoint for maintenance
 @app.post("/cleanup")
 async def cleanup_temp_files():
@@ -155,16 +295,8 @@ async def cleanup_temp_files():
     In production, you might want to add authentication here.
     """
     temp_dir = tempfile.gettempdir()
-    cleaned = 0
     try:
-        for filename in os.listdir(temp_dir):
-            if filename.endswith("_summary.pdf") or (filename.startswith("tmp") and filename.endswith(".pdf")):
-                filepath = os.path.join(temp_dir, filename)
-                try:
-                    os.remove(filepath)
-                    cleaned += 1
-                except:
-                    pass
+        cleaned = await asyncio.to_thread(_cleanup_temp_dir, temp_dir)
         return {"message": f"Cleaned up {cleaned} temporary files"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cleanup failed: {str(e)}")
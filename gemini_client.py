@@ -1,10 +1,29 @@
 # gemini_client.py
+import asyncio
+import base64
+import json
 import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+# Errors worth retrying with backoff (rate limiting / temporary overload)
+RETRYABLE_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable)
+
+SUMMARY_PROMPT = "Summarize this text clearly and concisely:\n\n"
+IMAGE_PROMPT = "Describe this image in detail for a PDF report."
+
+# Image formats Gemini accepts as-is
+SUPPORTED_IMAGE_MIME_TYPES = {"image/png", "image/jpeg", "image/webp"}
+
+# Batch API job states after which polling stops
+BATCH_DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
 
 class GeminiClient:
-    def __init__(self, model: str = "gemini-2.0-flash"):
+    def __init__(self, model: str = "gemini-2.0-flash", max_workers: int = 16):
         # Load variables from .env file
         load_dotenv()
 
@@ -15,18 +34,51 @@ class GeminiClient:
             )
 
         genai.configure(api_key=api_key)
+        self.api_key = api_key
         self.model = model
         self.client = genai.GenerativeModel(self.model)
+        # Threads for blocking SDK calls, separate from the loop's default
+        # executor so OCR and image encoding can't starve Gemini requests
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+
+    def close(self):
+        """Shut down the client's thread pool; calls already running finish on their own."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self, timeout: float = 5):
+        """
+        Open the connection to Gemini ahead of the first real request.
+        Uses count_tokens, which needs a round trip but generates nothing;
+        gives up after `timeout` seconds so a slow endpoint can't hold up startup.
+        """
+        self.client.count_tokens("warm-up", request_options={"timeout": timeout})
 
     def summarize_text(self, text: str) -> str:
+        response = self.client.generate_content(f"{SUMMARY_PROMPT}{text}")
+        return response.text
+
+    def summarize_texts(self, texts: list) -> list:
+        """
+        Summarize several independent texts with a single Gemini call.
+        The texts go in as a JSON array so no text can pose as the boundary of
+        another. Raises ValueError if the reply isn't one summary per text.
+        """
         response = self.client.generate_content(
-            f"Summarize this text clearly and concisely:\n\n{text}"
+            "The following JSON array contains independent texts. Summarize each text clearly "
+            "and concisely, using only that text. Respond with a JSON array of exactly "
+            f"{len(texts)} strings, one summary per text, in the same order.\n\n"
+            f"{json.dumps(texts, ensure_ascii=False)}",
+            generation_config={"response_mime_type": "application/json"},
         )
-        return response.text
+        summaries = json.loads(response.text)
+        if (not isinstance(summaries, list) or len(summaries) != len(texts)
+                or not all(isinstance(s, str) for s in summaries)):
+            raise ValueError("Batched reply is not one summary per text")
+        return summaries
 
-    def analyze_image(self, image_bytes: bytes) -> str:
+    def analyze_image(self, image_bytes: bytes, mime: str = "image/png") -> str:
         response = self.client.generate_content(
-            [f"Describe this image in detail for a PDF report.", {"mime_type": "image/png", "data": image_bytes}]
+            [IMAGE_PROMPT, {"mime_type": mime, "data": image_bytes}]
         )
         return response.text
 
@@ -37,4 +89,96 @@ class GeminiClient:
                 {"mime_type": "image/png", "data": image_bytes},
             ]
         )
-        return response.text
\ No newline at end of file
+        return response.text
+
+    async def _call_async(self, func, *args, max_retries: int = 5):
+        """
+        Run a blocking SDK call on the client's executor, retrying with exponential
+        backoff when Gemini rate-limits us. The sync SDK is used on purpose:
+        its async gRPC client binds to the first event loop it runs on, while
+        the pipeline may start a fresh loop for every document.
+        """
+        for attempt in range(max_retries + 1):
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+            except RETRYABLE_ERRORS:
+                if attempt == max_retries:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def summarize_text_async(self, text: str) -> str:
+        return await self._call_async(self.summarize_text, text)
+
+    async def summarize_texts_async(self, texts: list) -> list:
+        """
+        summarize_texts with retries. If the batched call fails (a blocked or
+        malformed reply, retries exhausted), each text is summarized on its
+        own; a text that fails again gets its exception in its result slot,
+        so one bad input doesn't fail the others.
+        """
+        if len(texts) > 1:
+            try:
+                return await self._call_async(self.summarize_texts, texts)
+            except Exception:
+                pass
+        return await asyncio.gather(
+            *(self.summarize_text_async(text) for text in texts), return_exceptions=True
+        )
+
+    async def analyze_image_async(self, image_bytes: bytes, mime: str = "image/png") -> str:
+        return await self._call_async(self.analyze_image, image_bytes, mime)
+
+    @staticmethod
+    def text_request(text: str) -> list:
+        """Batch API request parts equivalent to summarize_text(text)."""
+        return [{"text": f"{SUMMARY_PROMPT}{text}"}]
+
+    @staticmethod
+    def image_request(image_bytes: bytes, mime: str = "image/png") -> list:
+        """Batch API request parts equivalent to analyze_image(image_bytes, mime)."""
+        return [
+            {"text": IMAGE_PROMPT},
+            {"inline_data": {"mime_type": mime, "data": base64.b64encode(image_bytes).decode("ascii")}},
+        ]
+
+    def batch_generate(self, requests: dict, poll_interval: float = 30) -> dict:
+        """
+        Run many requests as one Gemini Batch API job and return {key: text}.
+        Batch jobs are billed at a discount and don't count against the
+        per-minute rate limits, but complete asynchronously (minutes to hours).
+        Requests that failed inside the job are missing from the result.
+        Needs the google-genai SDK.
+
+        Args:
+            requests: {key: parts} built with text_request() / image_request()
+            poll_interval: seconds between job status checks
+        """
+        from google import genai as genai_sdk  # only needed for batch mode
+
+        sdk = genai_sdk.Client(api_key=self.api_key)
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf-8", delete=False) as f:
+            for key, parts in requests.items():
+                f.write(json.dumps({"key": key, "request": {"contents": [{"parts": parts}]}}) + "\n")
+            src_path = f.name
+        try:
+            src = sdk.files.upload(file=src_path, config={"mime_type": "jsonl"})
+        finally:
+            os.remove(src_path)
+
+        job = sdk.batches.create(model=self.model, src=src.name)
+        while job.state.name not in BATCH_DONE_STATES:
+            time.sleep(poll_interval)
+            job = sdk.batches.get(name=job.name)
+        if job.state.name != "JOB_STATE_SUCCEEDED":
+            raise RuntimeError(f"Gemini batch job {job.name} ended in state {job.state.name}")
+
+        results = {}
+        for line in sdk.files.download(file=job.dest.file_name).decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            candidates = (entry.get("response") or {}).get("candidates") or []
+            if candidates:
+                parts = candidates[0].get("content", {}).get("parts", [])
+                results[entry["key"]] = "".join(part.get("text", "") for part in parts)
+        return results
@@ -36,4 +36,12 @@ def extract_image_metadata(pil_image: Image.Image) -> dict:
     ocr_text = ocr_image(pil_image)
     chart_flag = is_likely_chart(pil_image)
     w, h = pil_image.size
-    return {"ocr_text": ocr_text, "is_chart": chart_flag, "size": (w, h)}
\ No newline at end of file
+    return {"ocr_text": ocr_text, "is_chart": chart_flag, "size": (w, h)}
+
+def is_blank_image(pil_image: Image.Image, max_level: int = 16) -> bool:
+    """
+    Heuristic: a uniformly dark image (no pixel brighter than max_level in
+    grayscale) is filler with nothing to describe.
+    """
+    gray = np.asarray(pil_image.convert("L"), dtype=np.uint8)
+    return gray.max() < max_level
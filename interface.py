@@ -1,8 +1,9 @@
 # interface.py
 import streamlit as st
+import contextlib
 import tempfile
 import os
-import json
+import orjson
 import cloudinary
 import cloudinary.uploader
 from dotenv import load_dotenv
@@ -45,7 +46,7 @@ input_json = st.text_area(
 if input_json.strip():
     # Validate JSON
     try:
-        json_data = json.loads(input_json)
+        json_data = orjson.loads(input_json)
         
         # Check if content field exists
         if "content" not in json_data:
@@ -78,8 +79,8 @@ if input_json.strip():
                         cloudinary_url = upload_result["secure_url"]
                         
                         # Clean up temporary file
-                        if os.path.exists(output_pdf_path):
-                            os.remove(output_pdf_path)
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(output_pdf_path)
                         
                         st.success("✅ PDF uploaded to Cloudinary successfully!")
                         
@@ -108,11 +109,10 @@ if input_json.strip():
                 st.subheader("📋 Preview")
                 
                 # Show first 2000 characters
-                preview = text_preview[:2000]
-                if len(text_preview) > 2000:
-                    preview += "\n\n... (truncated, see full summary in the PDF)"
+                truncated = len(text_preview) > 2000
+                preview = text_preview[:2000] + ("\n\n... (truncated, see full summary in the PDF)" if truncated else "")
                 st.text_area("Summary Preview", preview, height=400)
     
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         st.error(f"❌ Invalid JSON format: {str(e)}")
         st.info("Please check your JSON syntax and try again.")
\ No newline at end of file
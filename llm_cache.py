@@ -0,0 +1,49 @@
+# llm_cache.py
+import json
+import os
+
+class LLMCache:
+    """
+    Persistent {key: Gemini response} store backed by a JSON file.
+    Keys are content hashes, so re-running a document only calls Gemini for
+    the chunks and images that changed since the last run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries = {}
+        self._dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                # Unreadable or corrupt cache: start over rather than fail the run
+                self._entries = {}
+            if not isinstance(self._entries, dict):
+                self._entries = {}
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def put(self, key: str, value: str):
+        self._entries[key] = value
+        self._dirty = True
+
+    def save(self):
+        """
+        Write the cache back to disk if anything was added. A cache that can't
+        be written (e.g. read-only directory) only costs the next run its hits,
+        so the error is reported instead of raised.
+        """
+        if not self._dirty:
+            return
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: could not save LLM cache to {self.path}: {e}")
+            return
+        self._dirty = False
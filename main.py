@@ -1,68 +1,136 @@
 import os
 from pdf_reader import extract_pages_text_and_images
 from summarizer import summarize_pdf_pages
+from llm_cache import LLMCache
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from datetime import datetime
+from functools import lru_cache
 import textwrap
 
+# Page geometry, fixed for every report
+PAGE_WIDTH, PAGE_HEIGHT = A4
+MARGIN = 20*mm
+TOP_Y = PAGE_HEIGHT - MARGIN
+
+# Static report fragments, built once instead of on every separator line
+SEP_EQ = "=" * 100
+SEP_DASH = "-" * 100
+
+WRAP_WIDTH = 95
+
+@lru_cache(maxsize=8)
+def _wrapper(indent: int) -> textwrap.TextWrapper:
+    """TextWrapper the report used originally, one per indent."""
+    return textwrap.TextWrapper(width=WRAP_WIDTH, initial_indent=' '*indent, subsequent_indent=' '*indent)
+
+def wrap_line(text: str, indent: int = 0) -> list:
+    """
+    Word wrap to WRAP_WIDTH characters with a fixed indent, with the same
+    result as TextWrapper(width=WRAP_WIDTH). Plain single-spaced prose takes a
+    split-and-accumulate fast path; text with hyphens (TextWrapper breaks
+    after them), odd spacing or words longer than a line goes to TextWrapper.
+    """
+    room = WRAP_WIDTH - indent
+    words = text.split()
+    if ('-' in text or ' '.join(words) != text
+            or any(len(word) > room for word in words)):
+        return _wrapper(indent).wrap(text)
+
+    pad = ' ' * indent
+    lines = []
+    line = []
+    length = 0
+    for word in words:
+        if line and length + 1 + len(word) > room:
+            lines.append(pad + ' '.join(line))
+            line, length = [], 0
+        length += len(word) + (1 if line else 0)
+        line.append(word)
+    if line:
+        lines.append(pad + ' '.join(line))
+    return lines
+
 def write_formatted_summary_pdf(summary_records, output_path="pdf_summary_report.pdf", source_filename="input.pdf"):
     """
     Generate a well-formatted PDF report from the summary records.
     This creates a PDF that looks like the formatted text report.
+    output_path may be a file path or a writable binary file object (e.g. io.BytesIO).
     """
     c = canvas.Canvas(output_path, pagesize=A4)
-    width, height = A4
-    margin = 20*mm
+    margin = MARGIN
+    current_font = None
     
-    def draw_separator(y_pos, char="=", width_chars=100):
+    def set_font(font, size):
+        """Switch font only when it differs; every setFont call writes a Tf operator"""
+        nonlocal current_font
+        if current_font != (font, size):
+            c.setFont(font, size)
+            current_font = (font, size)
+    
+    def new_page():
+        """Start a new page (ReportLab resets the font state on each page)"""
+        nonlocal current_font
+        c.showPage()
+        current_font = None
+    
+    def draw_separator(y_pos, separator=SEP_EQ):
         """Draw a separator line"""
-        separator = char * width_chars
-        c.setFont("Courier", 8)
+        set_font("Courier", 8)
         c.drawString(margin, y_pos, separator)
         return y_pos - 12
     
     def draw_centered_text(y_pos, text, font="Helvetica-Bold", size=12):
         """Draw centered text"""
-        c.setFont(font, size)
+        set_font(font, size)
         text_width = c.stringWidth(text, font, size)
-        x = (width - text_width) / 2
+        x = (PAGE_WIDTH - text_width) / 2
         c.drawString(x, y_pos, text)
         return y_pos - 15
     
+    def draw_lines(y_pos, lines, font, size, leading):
+        """
+        Draw lines as one text object per page (a single BT/ET block with
+        line advances) instead of one drawString per line
+        """
+        start = 0
+        while start < len(lines):
+            if y_pos < 50:
+                new_page()
+                y_pos = TOP_Y
+            fits = int((y_pos - 50) // leading) + 1
+            block = lines[start:start + fits]
+            start += len(block)
+            set_font(font, size)
+            text_obj = c.beginText(margin, y_pos)
+            text_obj.setLeading(leading)
+            text_obj.textLines(block)  # a list is drawn as-is, keeping indentation
+            c.drawText(text_obj)
+            y_pos -= leading * len(block)
+        return y_pos
+    
     def draw_wrapped_text(y_pos, text, font="Helvetica", size=10, max_width=170*mm, indent=0):
         """Draw wrapped text and return new y position"""
-        c.setFont(font, size)
-        wrapper = textwrap.TextWrapper(width=95, initial_indent=' '*indent, subsequent_indent=' '*indent)
         lines = []
         for paragraph in text.split('\n'):
-            if paragraph.strip():
-                lines.extend(wrapper.wrap(paragraph))
+            if paragraph and not paragraph.isspace():
+                lines.extend(wrap_line(paragraph, indent))
             else:
                 lines.append('')
         
-        for line in lines:
-            if y_pos < 50:
-                c.showPage()
-                y_pos = height - margin
-            c.drawString(margin, y_pos, line)
-            y_pos -= 12
-        
-        return y_pos
+        return draw_lines(y_pos, lines, font, size, 12)
     
     # Start first page
-    y = height - margin
+    y = TOP_Y
     
     # Header
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     y = draw_centered_text(y, "PDF SUMMARY REPORT", "Helvetica-Bold", 14)
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     
     # Metadata
-    c.setFont("Helvetica", 9)
+    set_font("Helvetica", 9)
     c.drawString(margin, y, f"Source File: {source_filename}")
     y -= 12
     c.drawString(margin, y, f"Generated: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
@@ -70,71 +138,67 @@ def write_formatted_summary_pdf(summary_records, output_path="pdf_summary_report
     c.drawString(margin, y, f"Total Pages: {len(summary_records)}")
     y -= 12
     
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     y -= 15
     
     # Table of Contents
-    c.setFont("Helvetica-Bold", 12)
+    set_font("Helvetica-Bold", 12)
     c.drawString(margin, y, "TABLE OF CONTENTS")
     y -= 12
-    y = draw_separator(y, "-", 100)
+    y = draw_separator(y, SEP_DASH)
     y -= 5
     
-    c.setFont("Helvetica", 9)
+    toc_lines = []
     for rec in summary_records:
         short_summary = rec['combined_short'][:75] + "..." if len(rec['combined_short']) > 75 else rec['combined_short']
-        line = f"Page {rec['page_no']:3d}: {short_summary}"
-        if y < 50:
-            c.showPage()
-            y = height - margin
-        c.drawString(margin, y, line)
-        y -= 11
+        toc_lines.append(f"Page {rec['page_no']:3d}: {short_summary}")
+    y = draw_lines(y, toc_lines, "Helvetica", 9, 11)
     
     y -= 10
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     
     # Detailed summaries for each page
     for rec in summary_records:
-        c.showPage()
-        y = height - margin
+        new_page()
+        y = TOP_Y
         
         y -= 10
-        y = draw_separator(y, "=", 100)
+        y = draw_separator(y, SEP_EQ)
         y = draw_centered_text(y, f"PAGE {rec['page_no']}", "Helvetica-Bold", 14)
-        y = draw_separator(y, "=", 100)
+        y = draw_separator(y, SEP_EQ)
         y -= 10
         
         # Text content section
-        c.setFont("Helvetica-Bold", 11)
+        set_font("Helvetica-Bold", 11)
         c.drawString(margin, y, "TEXT CONTENT:")
         y -= 12
-        y = draw_separator(y, "-", 100)
+        y = draw_separator(y, SEP_DASH)
         y -= 5
         
         if rec['text_summary']:
             y = draw_wrapped_text(y, rec['text_summary'], "Helvetica", 10)
         else:
-            c.setFont("Helvetica-Oblique", 10)
+            set_font("Helvetica-Oblique", 10)
             c.drawString(margin, y, "(No extractable text on this page)")
             y -= 15
         
         y -= 10
         
         # Image analysis section
-        c.setFont("Helvetica-Bold", 11)
+        set_font("Helvetica-Bold", 11)
         c.drawString(margin, y, "IMAGE ANALYSIS:")
         y -= 12
-        y = draw_separator(y, "-", 100)
+        y = draw_separator(y, SEP_DASH)
         y -= 5
         
         if rec['image_summaries']:
             for idx, imr in enumerate(rec['image_summaries'], 1):
-                c.setFont("Helvetica-Bold", 10)
+                set_font("Helvetica-Bold", 10)
                 c.drawString(margin, y, f"Image {idx}:")
                 y -= 15
                 
                 # Image metadata
-                c.setFont("Helvetica", 9)
+                set_font("Helvetica", 9)
                 c.drawString(margin + 5, y, "Dimensions: N/A x N/A pixels")
                 y -= 11
                 c.drawString(margin + 5, y, "Format: N/A")
@@ -142,7 +206,7 @@ def write_formatted_summary_pdf(summary_records, output_path="pdf_summary_report
                 c.drawString(margin + 5, y, "Mode: N/A")
                 y -= 15
                 
-                c.setFont("Helvetica-Bold", 9)
+                set_font("Helvetica-Bold", 9)
                 c.drawString(margin + 5, y, "Description:")
                 y -= 15
                 
@@ -150,44 +214,51 @@ def write_formatted_summary_pdf(summary_records, output_path="pdf_summary_report
                 y -= 15
                 
                 if y < 100:
-                    c.showPage()
-                    y = height - margin
+                    new_page()
+                    y = TOP_Y
         else:
-            c.setFont("Helvetica-Oblique", 10)
+            set_font("Helvetica-Oblique", 10)
             c.drawString(margin, y, "(No images detected on this page)")
             y -= 15
         
         y -= 10
     
     # Final page with end marker
-    c.showPage()
-    y = height - margin
+    new_page()
+    y = TOP_Y
     y -= 10
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     y = draw_centered_text(y, "END OF REPORT", "Helvetica-Bold", 14)
-    y = draw_separator(y, "=", 100)
+    y = draw_separator(y, SEP_EQ)
     
     c.save()
 
-def run(pdf_path: str, out_pdf: str = "pdf_summary_report.pdf"):
+def run(pdf_path: str, out_pdf: str = "pdf_summary_report.pdf", batch: bool = False):
     """
     Run the PDF summarization pipeline and generate a formatted PDF report.
     
     Args:
         pdf_path: Input PDF file path
         out_pdf: Output PDF report path
+        batch: summarize through the Gemini Batch API (cheaper, but slow to complete)
     
     Returns:
         str: Path to the generated PDF report
     """
     pages = extract_pages_text_and_images(pdf_path, ocr_on_fail=True)
     
+    # Gemini responses are cached next to the source PDF, so re-runs only pay
+    # for chunks and images that changed
+    cache = LLMCache(os.path.join(os.path.dirname(os.path.abspath(pdf_path)), ".summary_cache.json"))
+    
     # Generate summaries with text report for preview
     summaries, formatted_report = summarize_pdf_pages(
         pages, 
         model="gemini-2.0-flash",
         create_report=True,
-        source_file=pdf_path
+        source_file=pdf_path,
+        batch=batch,
+        cache=cache
     )
     
     # Generate formatted PDF report
@@ -203,5 +274,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--pdf", required=True, help="Path to input PDF")
     parser.add_argument("--out", default="pdf_summary_report.pdf", help="Output summary PDF")
+    parser.add_argument("--batch", action="store_true",
+                        help="Use the Gemini Batch API (cheaper, may take hours to complete)")
     args = parser.parse_args()
-    run(args.pdf, args.out)
+    run(args.pdf, args.out, batch=args.batch)
@@ -6,18 +6,27 @@ from PIL import Image
 import os
 from typing import List, Tuple
 
+# MIME types for the encoded image streams PyMuPDF reports, by extension
+IMAGE_MIME_TYPES = {"png": "image/png", "jpeg": "image/jpeg", "jpg": "image/jpeg", "webp": "image/webp"}
+
 def extract_pages_text_and_images(pdf_path: str, ocr_on_fail: bool = True) -> List[dict]:
     """
     Returns a list, one entry per page:
     {
       "page_no": int,
       "text": str,           # text extracted (may be empty)
-      "images": [PIL.Image], # images extracted from page as PIL images
+      "images": [{           # images extracted from page
+          "image": PIL.Image,  # decoded RGB image
+          "raw_bytes": bytes,  # encoded stream as stored in the PDF, None when it can't
+                               # stand in for the decoded image (rendered pages, CMYK, masks)
+          "mime": str          # MIME type of raw_bytes, None if unknown
+      }],
       "was_scanned": bool    # True if we had to use OCR
     }
     """
     doc = fitz.open(pdf_path)
     results = []
+    decoded = {}  # xref -> image entry, so images repeated across pages are decoded once
     for i in range(len(doc)):
         page = doc[i]
         text = page.get_text("text").strip()
@@ -26,18 +35,31 @@ def extract_pages_text_and_images(pdf_path: str, ocr_on_fail: bool = True) -> Li
         # Extract embedded images from the page
         for img_index, img in enumerate(page.get_images(full=True)):
             xref = img[0]
-            base_image = doc.extract_image(xref)
-            image_bytes = base_image["image"]
-            pil = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-            images.append(pil)
+            entry = decoded.get(xref)
+            if entry is None:
+                base_image = doc.extract_image(xref)
+                image_bytes = base_image["image"]
+                # Only gray/RGB streams without a soft mask look the same outside
+                # the PDF; CMYK JPEGs (often Adobe-inverted) and masked images don't
+                passthrough = base_image["colorspace"] in (1, 3) and not base_image.get("smask")
+                entry = {
+                    "image": Image.open(io.BytesIO(image_bytes)).convert("RGB"),
+                    "raw_bytes": image_bytes if passthrough else None,
+                    "mime": IMAGE_MIME_TYPES.get(base_image["ext"].lower()) if passthrough else None
+                }
+                decoded[xref] = entry
+            images.append(entry)
 
         was_scanned = False
         if (not text or len(text) < 30) and ocr_on_fail:
             # Fallback: render page to image and run OCR externally (we only convert here)
             was_scanned = True
-            pil_page = page.get_pixmap(dpi=200).pil_tobytes(format="png")
-            pil_image = Image.open(io.BytesIO(pil_page)).convert("RGB")
-            images.insert(0, pil_image)  # page image for OCR/graph analysis
+            # Build the PIL image straight from the pixmap's RGB samples rather
+            # than encoding it to PNG and decoding it again
+            pix = page.get_pixmap(dpi=200)
+            pil_image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            # page image for OCR/graph analysis
+            images.insert(0, {"image": pil_image, "raw_bytes": None, "mime": None})
             # do not run OCR here; leave to OCR module to decide
 
         results.append({
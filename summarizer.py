@@ -1,57 +1,112 @@
 # summarizer.py
+import asyncio
+import hashlib
 import io
+import re
+import sys
 import textwrap
-from gemini_client import GeminiClient
-from image_ocr import extract_image_metadata
+import threading
+from functools import lru_cache
+from gemini_client import GeminiClient, SUPPORTED_IMAGE_MIME_TYPES
+from image_ocr import extract_image_metadata, is_blank_image
+from llm_cache import LLMCache
 from tqdm import tqdm
 from datetime import datetime
 
-# Initialize Gemini client once
-client = GeminiClient()
+# main imports this module, so the PDF writer is imported on first use
+_write_pdf = None
+
+def _get_pdf_writer():
+    """main.write_formatted_summary_pdf, imported once and kept for later calls."""
+    global _write_pdf
+    if _write_pdf is None:
+        from main import write_formatted_summary_pdf as _write_pdf
+    return _write_pdf
+
+# Gemini requests in flight at once across the whole document
+LLM_CONCURRENCY = 16
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# One client per model, shared by every caller in the process
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(model: str = DEFAULT_MODEL) -> GeminiClient:
+    """Gemini client for a model, created on first use and shared afterwards."""
+    with _clients_lock:
+        client = _clients.get(model)
+        if client is None:
+            client = _clients[model] = GeminiClient(model, max_workers=LLM_CONCURRENCY)
+        return client
+
+def close_clients():
+    """Close every client get_client created; later calls create fresh ones."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+# Sentence ends (terminal punctuation or line breaks), where chunks may be split
+_SENTENCE_END_RE = re.compile(r"[.!?\n]+")
 
 def chunk_text(text: str, max_chars: int = 35000):
-    """Naive chunker by chars; tune for model context size."""
+    """
+    Split text into chunks of at most max_chars, packing whole sentences
+    greedily and only splitting inside a sentence longer than max_chars.
+    One pass over the sentence ends; chunks are slices of the original text.
+    """
     if len(text) <= max_chars:
         return [text]
     chunks = []
     start = 0
-    while start < len(text):
-        chunk = text[start:start+max_chars]
-        # try to break at last newline or sentence end
-        last_break = max(chunk.rfind("\n"), chunk.rfind("."))
-        if last_break > int(0.5*max_chars):
-            chunk = text[start:start+last_break+1]
-            start = start + last_break + 1
-        else:
-            start += max_chars
-        chunks.append(chunk)
+    last_end = 0  # end of the last complete sentence seen
+
+    def close_chunks_before(end: int):
+        nonlocal start
+        while end - start > max_chars:
+            cut = last_end if last_end > start else start + max_chars
+            chunks.append(text[start:cut])
+            start = cut
+
+    for match in _SENTENCE_END_RE.finditer(text):
+        close_chunks_before(match.end())
+        last_end = match.end()
+    close_chunks_before(len(text))
+    if start < len(text):
+        chunks.append(text[start:])
     return chunks
 
+@lru_cache(maxsize=32)
+def _wrapper(width: int, indent: int) -> textwrap.TextWrapper:
+    """Shared TextWrapper per (width, indent), instead of a new one per paragraph."""
+    indent_str = ' ' * indent
+    return textwrap.TextWrapper(
+        width=width,
+        initial_indent=indent_str,
+        subsequent_indent=indent_str,
+        break_long_words=False,
+        break_on_hyphens=False
+    )
+
 def format_paragraph(text: str, width: int = 100, indent: int = 0) -> str:
     """
     Format a paragraph with proper word wrapping and indentation.
     Uses textwrap for proper word boundaries.
     """
-    if not text.strip():
+    stripped = text.strip()
+    if not stripped:
         return ""
     
-    indent_str = ' ' * indent
     # Use textwrap for proper word wrapping
-    wrapped = textwrap.fill(
-        text.strip(),
-        width=width,
-        initial_indent=indent_str,
-        subsequent_indent=indent_str,
-        break_long_words=False,
-        break_on_hyphens=False
-    )
-    return wrapped
+    return _wrapper(width, indent).fill(stripped)
 
 def format_text_with_paragraphs(text: str, width: int = 100, indent: int = 0) -> str:
     """
     Format text preserving paragraph breaks with proper word wrapping.
     """
-    if not text.strip():
+    if not text or text.isspace():
         return ""
     
     # Split by double newlines (paragraph breaks) or single newlines
@@ -70,30 +125,39 @@ def format_text_with_paragraphs(text: str, width: int = 100, indent: int = 0) ->
     # Join with double newlines for paragraph separation
     return '\n\n'.join(formatted_paragraphs)
 
-def create_formatted_report(summaries: list, source_file: str = "document.pdf") -> str:
+REPORT_WIDTH = 100
+SEPARATOR = "=" * REPORT_WIDTH
+SUBSEPARATOR = "-" * REPORT_WIDTH
+HEADER_CENTERED = "PDF SUMMARY REPORT".center(REPORT_WIDTH)
+END_CENTERED = "END OF REPORT".center(REPORT_WIDTH)
+
+def create_formatted_report(summaries: list, source_file: str = "document.pdf",
+                            metadata: dict = None) -> str:
     """
     Create a professionally formatted report from page summaries.
+    metadata ({label: value}, e.g. {"Title": ...}) is listed after the header when given.
     """
-    lines = []
+    buf = io.StringIO()
+    w = buf.write
     timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-    separator = "=" * 100
-    subseparator = "-" * 100
     
     # HEADER SECTION
-    lines.append(separator)
-    lines.append("PDF SUMMARY REPORT".center(100))
-    lines.append(separator)
-    lines.append(f"Source File: {source_file}")
-    lines.append(f"Generated: {timestamp}")
-    lines.append(f"Total Pages: {len(summaries)}")
-    lines.append(separator)
-    lines.append("")
-    lines.append("")
+    w(f"{SEPARATOR}\n{HEADER_CENTERED}\n{SEPARATOR}\n")
+    w(f"Source File: {source_file}\n")
+    w(f"Generated: {timestamp}\n")
+    w(f"Total Pages: {len(summaries)}\n")
+    w(SEPARATOR)
+    
+    # METADATA SECTION
+    if metadata:
+        w(f"\n\nMETADATA:\n{SUBSEPARATOR}\n")
+        for label, value in metadata.items():
+            w(f"{label}: {value}\n")
+        w(SUBSEPARATOR)
+    w("\n\n\n")
     
     # TABLE OF CONTENTS
-    lines.append("TABLE OF CONTENTS")
-    lines.append(subseparator)
-    lines.append("")
+    w(f"TABLE OF CONTENTS\n{SUBSEPARATOR}\n\n")
     
     for summary in summaries:
         page_no = summary['page_no']
@@ -103,44 +167,29 @@ def create_formatted_report(summaries: list, source_file: str = "document.pdf")
         if len(short) > 85:
             short = short[:82] + "..."
         
-        lines.append(f"Page {page_no:3d}: {short}")
+        w(f"Page {page_no:3d}: {short}\n")
     
-    lines.append("")
-    lines.append(separator)
-    lines.append("")
-    lines.append("")
+    w(f"\n{SEPARATOR}\n\n\n")
     
     # DETAILED PAGE SUMMARIES
     for summary in summaries:
         page_no = summary['page_no']
         
         # Page header
-        lines.append("")
-        lines.append(separator)
-        lines.append(f"PAGE {page_no}".center(100))
-        lines.append(separator)
-        lines.append("")
+        w(f"\n{SEPARATOR}\n{f'PAGE {page_no}'.center(REPORT_WIDTH)}\n{SEPARATOR}\n\n")
         
         # TEXT CONTENT
         if summary['text_summary']:
-            lines.append("TEXT CONTENT:")
-            lines.append(subseparator)
-            lines.append("")
-            
-            formatted_text = format_text_with_paragraphs(summary['text_summary'], width=100)
-            lines.append(formatted_text)
-            lines.append("")
-            lines.append("")
+            w(f"TEXT CONTENT:\n{SUBSEPARATOR}\n\n")
+            w(format_text_with_paragraphs(summary['text_summary'], width=REPORT_WIDTH))
+            w("\n\n\n")
         
         # IMAGE ANALYSIS
         if summary['image_summaries']:
-            lines.append("IMAGE ANALYSIS:")
-            lines.append(subseparator)
-            lines.append("")
+            w(f"IMAGE ANALYSIS:\n{SUBSEPARATOR}\n\n")
             
             for idx, img_data in enumerate(summary['image_summaries'], 1):
-                lines.append(f"Image {idx}:")
-                lines.append("")
+                w(f"Image {idx}:\n\n")
                 
                 # Image metadata
                 meta = img_data['meta']
@@ -149,108 +198,312 @@ def create_formatted_report(summaries: list, source_file: str = "document.pdf")
                 img_format = meta.get('format', 'N/A')
                 mode = meta.get('mode', 'N/A')
                 
-                lines.append(f"  Dimensions: {width} x {height} pixels")
-                lines.append(f"  Format: {img_format}")
-                lines.append(f"  Mode: {mode}")
-                lines.append("")
-                lines.append("  Description:")
-                lines.append("")
+                w(f"  Dimensions: {width} x {height} pixels\n")
+                w(f"  Format: {img_format}\n")
+                w(f"  Mode: {mode}\n\n")
+                w("  Description:\n\n")
                 
                 # Format image description with indentation
-                desc = img_data['desc']
-                formatted_desc = format_text_with_paragraphs(desc, width=96, indent=4)
-                lines.append(formatted_desc)
-                lines.append("")
-                lines.append("")
+                w(format_text_with_paragraphs(img_data['desc'], width=96, indent=4))
+                w("\n\n\n")
         
-        lines.append("")
+        w("\n")
     
     # FOOTER
-    lines.append(separator)
-    lines.append("END OF REPORT".center(100))
-    lines.append(separator)
+    w(f"{SEPARATOR}\n{END_CENTERED}\n{SEPARATOR}")
     
-    return '\n'.join(lines)
+    return buf.getvalue()
+
+def _progress(*args, **kwargs) -> tqdm:
+    """
+    tqdm bar that repaints at most twice a second and stays silent when stderr
+    isn't a terminal (server logs, redirected output).
+    """
+    return tqdm(*args, disable=not sys.stderr.isatty(), mininterval=0.5, smoothing=0, **kwargs)
+
+# Page texts shorter than this (after whitespace normalization) are used as
+# their own summary instead of being sent to Gemini
+MIN_SUMMARY_CHARS = 40
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Descriptions Gemini gives for black/empty images, which are left out of the report
+BLACK_KEYWORDS = [
+    "completely black", "filled black rectangle", "solid black", "uniformly dark", 
+    "entirely black", "pure black", "devoid of", "no discernible",
+    "uniform expanse of darkness", "uniformly black", "solid, uniform expanse"
+]
+_BLACK_RE = re.compile("|".join(map(re.escape, BLACK_KEYWORDS)), re.IGNORECASE)
+
+def _is_black_image(desc: str) -> bool:
+    return _BLACK_RE.search(desc) is not None
+
+def _text_key(text: str):
+    """
+    Dedup key for a page's text, or None if the page is too short to be worth
+    summarizing. Texts equal after whitespace/case normalization share a key.
+    """
+    norm = _WHITESPACE_RE.sub(" ", text).strip().lower()
+    if len(norm) < MIN_SUMMARY_CHARS:
+        return None
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=16).hexdigest()
+
+# Per-thread scratch buffer for image encodes (encoding runs on worker threads)
+_encode_local = threading.local()
+
+def _image_payload(img: dict) -> tuple:
+    """
+    (bytes, mime) to send to Gemini for an extracted image: the PDF's own
+    encoded stream when Gemini accepts its format, otherwise a JPEG encode
+    (much cheaper than PNG's deflate).
+    """
+    if img["raw_bytes"] is not None and img["mime"] in SUPPORTED_IMAGE_MIME_TYPES:
+        return img["raw_bytes"], img["mime"]
+    buf = getattr(_encode_local, "buf", None)
+    if buf is None:
+        buf = _encode_local.buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate(0)
+    img["image"].save(buf, format="JPEG", quality=85)
+    return buf.getvalue(), "image/jpeg"
+
+def _first_line(s: str, n: int) -> str:
+    """First line of s, cut to n chars, without splitting the whole string."""
+    i = s.find('\n')
+    return s[:n] if i < 0 else s[:min(i, n)]
+
+def _page_output(page_no: int, text_summary: str, image_summaries: list) -> dict:
+    """Assemble one page's summary record, including the short TOC line."""
+    # Create a short combined page summary for table of contents
+    combined_short = ""
+    if text_summary:
+        # Get first line, at most 100 chars
+        combined_short += _first_line(text_summary, 100)
+    
+    if image_summaries:
+        img_desc = image_summaries[0]["desc"]
+        if img_desc:
+            combined_short += f" | Image: {_first_line(img_desc, 50)}"
+
+    return {
+        "page_no": page_no,
+        "text_summary": text_summary,
+        "image_summaries": image_summaries,
+        "combined_short": combined_short
+    }
+
+def _cache_key(client: GeminiClient, kind: str, data: bytes) -> str:
+    """LLM cache / batch request key: model, request kind and a SHA-256 of the input."""
+    return f"{client.model}:{kind}:{hashlib.sha256(data).hexdigest()}"
+
+class _LLMCalls:
+    """
+    Gemini calls for one summarization run: at most LLM_CONCURRENCY in flight,
+    one call per distinct input (a logo repeated on every page is analyzed
+    once), and answered from the LLM cache when the input was seen before.
+    """
+
+    def __init__(self, client: GeminiClient, cache: LLMCache = None):
+        self.client = client
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+        self._calls = {}  # key -> task, shared by every request for the same input
+
+    def _call(self, key: str, func, *args) -> asyncio.Future:
+        task = self._calls.get(key)
+        if task is None:
+            task = self._calls[key] = asyncio.ensure_future(self._run(key, func, *args))
+        return task
+
+    async def _run(self, key: str, func, *args) -> str:
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        async with self.semaphore:
+            result = await func(*args)
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    async def summarize_text(self, chunk: str) -> str:
+        key = _cache_key(self.client, "text", chunk.encode("utf-8"))
+        return await self._call(key, self.client.summarize_text_async, chunk)
 
-def summarize_pdf_pages(page_records: list, model="gemini-2.0-flash", 
-                        create_report: bool = False, source_file: str = "document.pdf"):
+    async def analyze_image(self, img: dict) -> str:
+        data, mime = await asyncio.to_thread(_image_payload, img)
+        key = _cache_key(self.client, "image", data)
+        return await self._call(key, self.client.analyze_image_async, data, mime)
+
+async def _summarize_text_block(llm: _LLMCalls, text: str) -> str:
+    """Summarize a block of text (a page, a JSON document) — chunk if necessary, all chunks at once."""
+    chunk_summaries = await asyncio.gather(*(llm.summarize_text(c) for c in chunk_text(text)))
+    return "\n\n".join(s.strip() for s in chunk_summaries)  # Double newline between chunks
+
+def _start_text_summaries(llm: _LLMCalls, page_records: list) -> list:
+    """
+    Start one summary task per distinct page text and return an awaitable per page.
+    Pages with the same normalized text (repeated boilerplate, copied TOCs) share
+    one task; near-empty pages are used verbatim without calling Gemini.
+    """
+    loop = asyncio.get_running_loop()
+    seen = {}
+    summaries = []
+    for rec in page_records:
+        text = rec["text"]
+        key = _text_key(text)
+        if key is None:
+            verbatim = loop.create_future()
+            verbatim.set_result(text.strip())
+            summaries.append(verbatim)
+            continue
+        if key not in seen:
+            seen[key] = asyncio.ensure_future(_summarize_text_block(llm, text))
+        summaries.append(seen[key])
+    return summaries
+
+async def _summarize_image(llm: _LLMCalls, img: dict):
+    """
+    Return (meta, desc) for one image; OCR metadata and the Gemini call run side
+    by side. Blank images are skipped without calling Gemini and return None.
+    """
+    if await asyncio.to_thread(is_blank_image, img["image"]):
+        return None
+    return await asyncio.gather(
+        # OCR/OpenCV work is blocking, keep it off the event loop
+        asyncio.to_thread(extract_image_metadata, img["image"]),
+        llm.analyze_image(img),
+    )
+
+async def _summarize_page(llm: _LLMCalls, rec: dict, text_summary_task, pbar) -> dict:
+    """Summarize one page record's text and images concurrently."""
+    text_summary, *images = await asyncio.gather(
+        text_summary_task,
+        *(_summarize_image(llm, img) for img in rec["images"])
+    )
+
+    # Summarize images
+    image_summaries = []
+    for result in images:
+        if result is None:
+            continue
+        meta, desc = result
+        # Only add if it's not a black/empty image
+        if not _is_black_image(desc):
+            image_summaries.append({"meta": meta, "desc": desc.strip()})
+
+    pbar.update()
+    return _page_output(rec["page_no"], text_summary, image_summaries)
+
+async def _summarize_pages_async(client: GeminiClient, page_records: list, cache: LLMCache = None) -> list:
+    """
+    Summarize all pages at once: every chunk and image request of every page is
+    issued together, at most LLM_CONCURRENCY in flight. Results keep page order.
+    """
+    llm = _LLMCalls(client, cache)
+    text_summaries = _start_text_summaries(llm, page_records)
+    with _progress(total=len(page_records), desc="Summarizing pages") as pbar:
+        return await asyncio.gather(
+            *(_summarize_page(llm, rec, text_summary, pbar)
+              for rec, text_summary in zip(page_records, text_summaries))
+        )
+
+def _summarize_pages_batch(client: GeminiClient, page_records: list, cache: LLMCache = None) -> list:
+    """
+    Summarize all pages with a single Gemini Batch API job: every text chunk and
+    image becomes one request, keyed by a hash of its content so repeats are
+    sent once. Cached inputs are not sent at all; requests that fail inside
+    the job are retried as direct calls.
+    """
+    requests = {}
+    results = {}
+    pages = []
+
+    def add_request(key, parts, call, *args):
+        cached = cache.get(key) if cache is not None else None
+        if cached is not None:
+            results[key] = cached
+        else:
+            requests[key] = (parts, call, args)
+
+    for rec in page_records:
+        text = rec["text"]
+        chunk_keys = []
+        if _text_key(text) is not None:
+            for c in chunk_text(text):
+                key = _cache_key(client, "text", c.encode("utf-8"))
+                add_request(key, client.text_request(c), client.summarize_text, c)
+                chunk_keys.append(key)
+
+        images = []
+        for img in rec["images"]:
+            if is_blank_image(img["image"]):
+                continue
+            meta = extract_image_metadata(img["image"])
+            data, mime = _image_payload(img)
+            key = _cache_key(client, "image", data)
+            add_request(key, client.image_request(data, mime), client.analyze_image, data, mime)
+            images.append((meta, key))
+        pages.append((rec, chunk_keys, images))
+
+    if requests:
+        results.update(client.batch_generate({key: parts for key, (parts, _, _) in requests.items()}))
+
+    def result(key: str) -> str:
+        if key not in results:
+            _, call, args = requests[key]
+            results[key] = call(*args)
+        if cache is not None and key in requests:
+            cache.put(key, results[key])
+        return results[key]
+
+    outputs = []
+    for rec, chunk_keys, images in pages:
+        if chunk_keys:
+            text_summary = "\n\n".join(result(key).strip() for key in chunk_keys)
+        else:
+            text_summary = rec["text"].strip()
+
+        image_summaries = []
+        for meta, key in images:
+            desc = result(key)
+            if not _is_black_image(desc):
+                image_summaries.append({"meta": meta, "desc": desc.strip()})
+
+        outputs.append(_page_output(rec["page_no"], text_summary, image_summaries))
+    return outputs
+
+def summarize_pdf_pages(page_records: list, model=DEFAULT_MODEL, 
+                        create_report: bool = False, source_file: str = "document.pdf",
+                        batch: bool = False, cache: LLMCache = None):
     """
     Summarize PDF pages with optional formatted text report.
+    Pages are summarized concurrently; must be called from synchronous code
+    (it runs its own event loop).
     
     Args:
         page_records: output of extract_pages_text_and_images()
         model: Gemini model to use
         create_report: if True, returns (summaries, formatted_report_text)
         source_file: source filename for report header
+        batch: if True, send all requests as one Gemini Batch API job instead
+               of direct calls — cheaper, but the job can take minutes to hours,
+               so only for offline runs
+        cache: optional LLMCache; chunks and images already in it skip Gemini,
+               new responses are added and the cache is saved on exit
     
     Returns:
         list of dicts: [{'page_no', 'text_summary', 'image_summaries', 'combined_short'}]
         or tuple: (summaries_list, formatted_report_text) if create_report=True
     """
-    outputs = []
-    
-    for rec in tqdm(page_records, desc="Summarizing pages"):
-        page_no = rec["page_no"]
-        text = rec["text"]
-
-        # Summarize text — chunk if necessary
-        text_summary = ""
-        if text.strip():
-            chunks = chunk_text(text)
-            chunk_summaries = []
-            for c in chunks:
-                s = client.summarize_text(c)
-                chunk_summaries.append(s.strip())
-            text_summary = "\n\n".join(chunk_summaries)  # Double newline between chunks
+    try:
+        if batch:
+            outputs = _summarize_pages_batch(get_client(model), page_records, cache)
         else:
-            text_summary = ""
-
-        # Summarize images
-        image_summaries = []
-        for img in rec["images"]:
-            meta = extract_image_metadata(img)
-            # Convert PIL image → bytes for Gemini
-            buf = io.BytesIO()
-            img.save(buf, format="PNG")
-            desc = client.analyze_image(buf.getvalue())
-            desc_lower = desc.strip().lower()
-            
-            # Filter out black/empty images
-            black_keywords = [
-                "completely black", "filled black rectangle", "solid black", "uniformly dark", 
-                "entirely black", "pure black", "devoid of", "no discernible",
-                "uniform expanse of darkness", "uniformly black", "solid, uniform expanse"
-            ]
-            
-            is_black_image = any(keyword in desc_lower for keyword in black_keywords)
-            
-            # Only add if it's not a black/empty image
-            if not is_black_image:
-                image_summaries.append({"meta": meta, "desc": desc.strip()})
-
-        # Create a short combined page summary for table of contents
-        combined_short = ""
-        if text_summary:
-            # Get first sentence or first 100 chars
-            first_line = text_summary.split('\n')[0]
-            if len(first_line) > 100:
-                first_line = first_line[:100]
-            combined_short += first_line
-        
-        if image_summaries:
-            img_desc = image_summaries[0]["desc"]
-            if img_desc:
-                first_img_line = img_desc.split('\n')[0]
-                if len(first_img_line) > 50:
-                    first_img_line = first_img_line[:50]
-                combined_short += f" | Image: {first_img_line}"
-
-        outputs.append({
-            "page_no": page_no,
-            "text_summary": text_summary,
-            "image_summaries": image_summaries,
-            "combined_short": combined_short
-        })
+            outputs = asyncio.run(_summarize_pages_async(get_client(model), page_records, cache))
+    finally:
+        if cache is not None:
+            cache.save()
     
     if create_report:
         formatted_report = create_formatted_report(outputs, source_file)
@@ -258,7 +511,8 @@ def summarize_pdf_pages(page_records: list, model="gemini-2.0-flash",
     
     return outputs
 
-def summarize_json_input(json_data: dict, output_pdf_path: str, model="gemini-2.0-flash"):
+def summarize_json_input(json_data: dict, output_pdf_path: str, model=DEFAULT_MODEL,
+                         text_summary: str = None, client: GeminiClient = None):
     """
     Summarize JSON input data and generate a formatted PDF report.
     
@@ -272,14 +526,17 @@ def summarize_json_input(json_data: dict, output_pdf_path: str, model="gemini-2.
                           "source": "optional source"
                       }
                   }
-        output_pdf_path: Path where the output PDF will be saved
+        output_pdf_path: Path where the output PDF will be saved, or a
+                         writable binary file object (e.g. io.BytesIO)
         model: Gemini model to use
+        text_summary: precomputed summary of the content (e.g. from a batched
+                      Gemini call); when given, the content is not summarized again
+        client: Gemini client to use instead of get_client(model) (e.g. the
+                API server's client, created and warmed at startup)
     
     Returns:
-        tuple: (pdf_path, formatted_report_text)
+        tuple: (output_pdf_path, formatted_report_text)
     """
-    from main import write_formatted_summary_pdf
-    
     # Extract content from JSON
     text = json_data.get("content", "")
     metadata = json_data.get("metadata", {})
@@ -289,46 +546,37 @@ def summarize_json_input(json_data: dict, output_pdf_path: str, model="gemini-2.
     source_author = metadata.get("author", "")
     source_name = metadata.get("source", "json_data.json")
     
-    # Chunk the text if necessary
-    text_summary = ""
-    if text.strip():
-        chunks = chunk_text(text)
-        chunk_summaries = []
-        for c in tqdm(chunks, desc="Summarizing JSON content"):
-            s = client.summarize_text(c)
-            chunk_summaries.append(s.strip())
-        text_summary = "\n\n".join(chunk_summaries)
+    # Summarize the content unless a summary was passed in
+    if text_summary is not None:
+        text_summary = text_summary.strip()
+    elif text and not text.isspace():
+        # Runs on a worker thread under the API server, so there is no running loop here
+        text_summary = asyncio.run(_summarize_text_block(_LLMCalls(client or get_client(model)), text))
+    else:
+        text_summary = ""
     
     # Create a summary record (simulating page 1)
     summary_record = {
         "page_no": 1,
         "text_summary": text_summary,
         "image_summaries": [],  # No images from JSON input
-        "combined_short": text_summary.split('\n')[0][:100] if text_summary else source_title
+        "combined_short": _first_line(text_summary, 100) if text_summary else source_title
     }
     
     summaries = [summary_record]
     
-    # Create formatted text report with metadata
-    formatted_report = create_formatted_report(summaries, source_file=source_name)
+    # Metadata section for the report, if available
+    report_metadata = {}
+    if source_title != "JSON Input":
+        report_metadata["Title"] = source_title
+    if source_author:
+        report_metadata["Author"] = source_author
     
-    # Add metadata section to the report if available
-    if source_author or source_title != "JSON Input":
-        metadata_section = "\n\nMETADATA:\n"
-        metadata_section += "-" * 100 + "\n"
-        if source_title != "JSON Input":
-            metadata_section += f"Title: {source_title}\n"
-        if source_author:
-            metadata_section += f"Author: {source_author}\n"
-        metadata_section += "-" * 100 + "\n"
-        # Insert metadata after header
-        formatted_report = formatted_report.replace(
-            "=" * 100 + "\n\n\n",
-            "=" * 100 + metadata_section + "\n\n",
-            1
-        )
+    # Create formatted text report with metadata
+    formatted_report = create_formatted_report(summaries, source_file=source_name,
+                                               metadata=report_metadata)
     
     # Generate formatted PDF report
-    write_formatted_summary_pdf(summaries, output_path=output_pdf_path, source_filename=source_name)
+    _get_pdf_writer()(summaries, output_path=output_pdf_path, source_filename=source_name)
     
     return output_pdf_path, formatted_report
\ No newline at end of file
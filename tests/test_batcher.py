@@ -0,0 +1,102 @@
+# test_batcher.py
+import asyncio
+import random
+
+import pytest
+
+from batcher import AsyncBatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_results_go_back_to_their_callers():
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        await asyncio.sleep(0)
+        return [item.upper() for item in items]
+
+    async def main():
+        batcher = AsyncBatcher(process, max_batch_size=8, max_wait_ms=20, max_batch_chars=1000)
+        items = ["x" * random.randint(1, 200) + str(i) for i in range(30)]
+        results = await asyncio.gather(*(batcher.submit(item) for item in items))
+        return items, results
+
+    random.seed(0)
+    items, results = run(main())
+    assert results == [item.upper() for item in items]
+    assert all(len(batch) <= 8 for batch in batches)
+    assert sorted(i for batch in batches for i in batch) == sorted(items)
+
+
+def test_buckets_respect_max_batch_chars():
+    batcher = AsyncBatcher(None, max_batch_chars=100)
+    pending = [("x" * n, None) for n in (90, 10, 40, 60, 5, 95, 30)]
+    buckets = batcher._buckets(pending)
+    assert sorted(len(e[0]) for b in buckets for e in b) == sorted(len(e[0]) for e in pending)
+    for bucket in buckets:
+        assert len(bucket) == 1 or sum(len(item) for item, _ in bucket) <= 100
+
+
+def test_exception_result_fails_only_its_item():
+    async def process(items):
+        return [ValueError(item) if item == "boom" else item.upper() for item in items]
+
+    async def main():
+        batcher = AsyncBatcher(process)
+        return await asyncio.gather(batcher.submit("x"), batcher.submit("boom"), return_exceptions=True)
+
+    ok, failed = run(main())
+    assert ok == "X"
+    assert isinstance(failed, ValueError)
+
+
+def test_raising_batch_fails_every_item():
+    async def process(items):
+        raise RuntimeError("down")
+
+    async def main():
+        batcher = AsyncBatcher(process)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in run(main()))
+
+
+def test_wrong_result_count_is_an_error():
+    async def process(items):
+        return items[:-1]
+
+    async def main():
+        batcher = AsyncBatcher(process)
+        return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in run(main()))
+
+
+def test_summarize_texts_async_falls_back_per_item():
+    pytest.importorskip("google.generativeai")
+    from gemini_client import GeminiClient
+
+    client = GeminiClient.__new__(GeminiClient)
+
+    async def call_async(func, *args):
+        return func(*args)
+
+    def summarize_texts(texts):
+        raise ValueError("blocked")
+
+    async def summarize_text_async(text):
+        if text == "boom":
+            raise ValueError("blocked")
+        return text.upper()
+
+    client._call_async = call_async
+    client.summarize_texts = summarize_texts
+    client.summarize_text_async = summarize_text_async
+
+    ok, failed = run(client.summarize_texts_async(["x", "boom"]))
+    assert ok == "X"
+    assert isinstance(failed, ValueError)
@@ -0,0 +1,39 @@
+# test_chunk_text.py
+import random
+
+import pytest
+
+summarizer = pytest.importorskip("summarizer")
+chunk_text = summarizer.chunk_text
+
+
+def random_text(rng, n_sentences):
+    sentences = []
+    for _ in range(n_sentences):
+        words = " ".join("w" * rng.randint(1, 12) for _ in range(rng.randint(1, 40)))
+        sentences.append(words + rng.choice([".", "!", "?", "\n", ". ", "...\n\n", ""]))
+    return " ".join(sentences)
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("", max_chars=10) == [""]
+    assert chunk_text("Hello. World.", max_chars=100) == ["Hello. World."]
+
+
+@pytest.mark.parametrize("max_chars", [1, 7, 50, 200, 1000])
+def test_chunks_rejoin_to_input_and_fit(max_chars):
+    rng = random.Random(max_chars)
+    for _ in range(50):
+        text = random_text(rng, rng.randint(0, 80))
+        chunks = chunk_text(text, max_chars=max_chars)
+        assert "".join(chunks) == text
+        assert all(0 < len(c) <= max_chars for c in chunks) or chunks == [""]
+
+
+def test_splits_between_sentences():
+    text = "First sentence here. Second one follows! Third?"
+    assert chunk_text(text, max_chars=25) == ["First sentence here.", " Second one follows!", " Third?"]
+
+
+def test_sentence_longer_than_max_is_hard_split():
+    assert chunk_text("abcdefghij. xy", max_chars=4) == ["abcd", "efgh", "ij.", " xy"]